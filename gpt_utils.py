@@ -1,75 +1,160 @@
+import asyncio
 import openai
-import os
-import json
-from openai import AzureOpenAI
-import time
-from dotenv import load_dotenv
-from pprint import pprint
-from itertools import chain
-import pandas as pd
-from tqdm import tqdm
-from azure.identity import DefaultAzureCredential, get_bearer_token_provider
-from typing import Dict, Union
+import random
+from openai import AsyncAzureOpenAI
 
 endpoint = "https://eitamazureopenai.openai.azure.com/openai/deployments/o1/chat/completions?api-version=2025-01-01-preview"
 api_version = "2024-12-01-preview"
-tqdm.pandas()
 
 
 
 
+# Errors worth retrying: rate limiting, transient server errors, and connection problems/timeouts
+RETRIABLE_ERRORS = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError)
+
+# Shared bearer-token provider, created on first use so importing this module stays cheap
+_token_provider = None
+
+
+def get_token_provider():
+    global _token_provider
+    if _token_provider is None:
+        from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+        _token_provider = get_bearer_token_provider(
+            DefaultAzureCredential(),
+            "https://cognitiveservices.azure.com/.default")
+    return _token_provider
+
+
 class GptCall:
     def __init__(self, gpt_version='gpt4', evaluation_criteria=None):
         self.gpt_version = gpt_version
+        self._client = None
 
     
-    def init_gpt(self):
+    def _get_client(self):
 
-        if self.gpt_version == 'gpt4':
-            token_provider = get_bearer_token_provider(
-                DefaultAzureCredential(),
-                "https://cognitiveservices.azure.com/.default")
+        if self._client is not None:
+            return self._client
 
+        if self.gpt_version == 'gpt4':
             # endpoint = os.getenv("GPT4_OPENAI_ENDPOINT")
 
-            client = AzureOpenAI(
-                azure_ad_token_provider=token_provider,
+            client = AsyncAzureOpenAI(
+                azure_ad_token_provider=get_token_provider(),
                 azure_endpoint=endpoint,
-                api_version=api_version #  os.getenv("GPT4_DEPLOYMENT_VERSION")
+                api_version=api_version, #  os.getenv("GPT4_DEPLOYMENT_VERSION")
+                max_retries=0  # Retries are handled in get_gpt_response
             )
             # model = os.getenv("GPT4_DEPLOYMENT_NAME")
             
         else:
             raise ValueError(f'Invalid gpt_version: {self.gpt_version}')
         
+        # Reuse the client (and its connection pool / token cache) across calls
+        self._client = client
         return client
 
 
 
-    def call_gpt(self, messages):
+    async def call_gpt(self, messages):
 
-        client = self.init_gpt()
+        client = self._get_client()
 
-        gpt_response = self.get_gpt_response(client, messages)
+        gpt_response = await self.get_gpt_response(client, messages)
         return gpt_response
+
+
+    async def stream_gpt(self, messages, max_attempts=5):
+        """Yield the response text piece by piece as it is generated.
+        Opening the stream is retried like get_gpt_response until the first chunk arrives."""
+
+        client = self._get_client()
+
+        async def open_stream(attempt):
+            stream = await client.chat.completions.create(
+                model="o1",
+                messages=messages,
+                seed=42 + attempt,
+                stream=True)
+            try:
+                # Read the first chunk here so errors before any text arrives are retried too
+                return stream, await anext(stream, None)
+            except BaseException:
+                await stream.close()
+                raise
+
+        stream, chunk = await GptCall.call_with_retries(open_stream, max_attempts)
+        # Once text has been yielded a retry would repeat it, so later errors propagate.
+        # The stream is closed even if the caller stops reading early.
+        try:
+            while chunk is not None:
+                # Some chunks (e.g. content filter results) carry no choices or no text
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                chunk = await anext(stream, None)
+        finally:
+            await stream.close()
+
+
+    async def call_gpt_batch(self, messages_list, max_concurrency=10):
+        """Send several independent conversations concurrently, at most max_concurrency requests at a time.
+        Responses are returned in the same order as messages_list."""
+
+        client = self._get_client()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _one(messages):
+            async with semaphore:
+                return await self.get_gpt_response(client, messages)
+
+        return await asyncio.gather(*[_one(messages) for messages in messages_list])
     
     
 
     @staticmethod
-    def get_gpt_response(client, messages, ):
-        seed = 42
+    def get_retry_delay(error, attempt, max_delay=30):
+        """Seconds to wait before retrying: the server's Retry-After if given, else exponential backoff with jitter"""
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), max_delay)
+            except ValueError:
+                pass
+        return random.uniform(0, min(max_delay, 2 ** attempt))
+
+    @staticmethod
+    async def call_with_retries(request, max_attempts=5):
+        """Await request(attempt), retrying RETRIABLE_ERRORS with get_retry_delay between attempts.
+        Other errors, and the last retriable one, propagate."""
         attempts = 0
-        while attempts < 3:
+        while True:
             try:
-                response = client.chat.completions.create(
-                    model="o1",
-                    messages=messages,
-                    seed=seed + attempts)
-                return response.choices[0].message.content
-            except Exception as e:
+                return await request(attempts)
+            except RETRIABLE_ERRORS as e:
                 print(e)
-                time.sleep(2)
                 attempts += 1
-        return []
-
+                if attempts >= max_attempts:
+                    raise
+                await asyncio.sleep(GptCall.get_retry_delay(e, attempts))
 
+    @staticmethod
+    async def get_gpt_response(client, messages, max_attempts=5):
+
+        async def request(attempt):
+            response = await client.chat.completions.create(
+                model="o1",
+                messages=messages,
+                seed=42 + attempt)
+            return response.choices[0].message.content
+
+        try:
+            return await GptCall.call_with_retries(request, max_attempts)
+        except RETRIABLE_ERRORS:
+            # Already printed on each attempt
+            return []
+        except Exception as e:
+            # Bad requests, auth errors etc. will not succeed on retry
+            print(e)
+            return []
@@ -1,6 +1,10 @@
 import asyncio
+import concurrent.futures
 import os
+import re
 import sys
+import threading
+from collections import deque
 from typing import Optional
 from contextlib import AsyncExitStack
 
@@ -12,8 +16,9 @@ from mcp.client.stdio import stdio_client
 
 # Import our custom GPT utility class
 from gpt_utils import GptCall
+from mcp_tool_utils import ToolCacheMixin, describe_tool
 
-class MCPStdioClient:
+class MCPStdioClient(ToolCacheMixin):
     """
     An MCP client that connects to an MCP server using stdio communication
     and processes queries using Azure OpenAI via the GptCall utility and the server's tools.
@@ -32,12 +37,19 @@ class MCPStdioClient:
         self.write = None
         self.exit_stack = AsyncExitStack()
         
-        # Store server tools
-        self.tools = []
+        # Environment for the server process, with variables loaded from .env
+        self._env = os.environ.copy()
         
-        # Store conversation history (last 3 exchanges)
-        self.conversation_history = []
+        # Server tools and cached tool results, plus a pattern matching any
+        # tool name so a response is scanned for all tools in one pass
+        self.init_tool_cache()
+        self._tool_pattern = None
+        self._system_message = self.build_system_message()
+        
+        # Store conversation history (last 3 exchanges, at most ~4000 tokens in the prompt)
         self.max_history_length = 3
+        self.max_history_tokens = 4000
+        self.conversation_history = deque(maxlen=self.max_history_length)
 
     async def connect_to_server(self, server_script_path: str, use_uv: bool = False, server_dir: str = None) -> bool:
         """
@@ -62,8 +74,6 @@ class MCPStdioClient:
                 return False
 
             # Configure server parameters based on whether we're using uv or not
-            env = os.environ.copy()  # Use environment with variables loaded from .env
-            
             if use_uv and is_python and server_dir:
                 # Using uv to run the server from specified directory
                 print(f"Using uv to run server from directory: {server_dir}")
@@ -78,7 +88,7 @@ class MCPStdioClient:
             server_params = StdioServerParameters(
                 command=command,
                 args=args,
-                env=env
+                env=self._env
             )
 
             # Connect to server
@@ -90,9 +100,9 @@ class MCPStdioClient:
             print("Initializing MCP session...")
             await self.session.initialize()
 
-            # Fetch available tools
-            response = await self.session.list_tools()
-            self.tools = response.tools
+            # Fetch available tools (results from a previous server are no longer valid)
+            self._tool_cache.clear()
+            await self.list_tools(refresh=True)
             
             if self.tools:
                 print(f"\nConnected to server with {len(self.tools)} tools:")
@@ -109,58 +119,101 @@ class MCPStdioClient:
             traceback.print_exc()
             return False
 
+    def on_tools_updated(self):
+        """Rebuild the tool name pattern and the system message after the tools are fetched"""
+        # Longest names first so a name is not shadowed by a shorter prefix
+        names = sorted(self._tools_by_name, key=len, reverse=True)
+        self._tool_pattern = re.compile("|".join(map(re.escape, names))) if names else None
+        super().on_tools_updated()
+
     def add_to_conversation_history(self, query: str, response: str):
         """Add a query-response pair to conversation history"""
+        # The deque keeps only the last max_history_length exchanges
         self.conversation_history.append({
             "query": query,
             "response": response
         })
-        
-        # Keep only the last 3 exchanges
-        if len(self.conversation_history) > self.max_history_length:
-            self.conversation_history = self.conversation_history[-self.max_history_length:]
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token count for prompt budgeting (about 4 characters per token)"""
+        return len(text) // 4 + 1
 
     def create_conversation_summary(self) -> str:
         """Create a summary of previous conversation exchanges"""
         if not self.conversation_history:
             return ""
         
-        summary_parts = []
-        for i, exchange in enumerate(self.conversation_history, 1):
+        # Walk from the newest exchange back, dropping older ones once the token budget is used up
+        exchanges = []
+        total_tokens = 0
+        for exchange in reversed(self.conversation_history):
             # Truncate long responses for summary
             response_preview = exchange["response"][:200] + "..." if len(exchange["response"]) > 200 else exchange["response"]
-            summary_parts.append(f"Exchange {i}:\nQ: {exchange['query']}\nA: {response_preview}")
+            tokens = self.estimate_tokens(exchange["query"]) + self.estimate_tokens(response_preview)
+            if exchanges and total_tokens + tokens > self.max_history_tokens:
+                break
+            exchanges.append((exchange["query"], response_preview))
+            total_tokens += tokens
+        
+        summary_parts = []
+        for i, (query, response_preview) in enumerate(reversed(exchanges), 1):
+            summary_parts.append(f"Exchange {i}:\nQ: {query}\nA: {response_preview}")
         
         return "\n\n".join(summary_parts)
 
+    def build_system_message(self) -> str:
+        """Build the system message describing the server's tools (without conversation history)"""
+        tools_info = "\n".join([describe_tool(tool) for tool in self.tools])
+        return f"""You are a helpful assistant that helps users with queries. 
+You have access to the following tools:
+{tools_info}
+
+If you need to use any of these tools to answer the user's question, please specify which tool you want to use and what parameters you need."""
+
     def build_context_messages(self, current_query: str) -> list:
         """Build messages list with conversation history context"""
-        # Create system message with tools info
-        tools_info = "\n".join([f"- {tool.name}: {tool.description}" for tool in self.tools])
-        
-        # Add conversation history to system message if exists
+        # Add conversation history to the cached system message if exists
         conversation_summary = self.create_conversation_summary()
         history_context = ""
         if conversation_summary:
             history_context = f"\n\nPrevious conversation context:\n{conversation_summary}\n"
         
-        system_message = f"""You are a helpful assistant that helps users with queries. 
-You have access to the following tools:
-{tools_info}
-
-If you need to use any of these tools to answer the user's question, please specify which tool you want to use and what parameters you need.{history_context}"""
+        system_message = self._system_message + history_context
 
         return [
             {"role": "system", "content": system_message},
             {"role": "user", "content": current_query}
         ]
 
-    async def process_query(self, query: str) -> str:
+    async def get_gpt_text(self, messages: list, stream: bool = False) -> str:
+        """
+        Get a GPT response, optionally printing it as it is generated
+        
+        Args:
+            messages: Chat messages to send
+            stream: Whether to stream the response and print tokens as they arrive
+            
+        Returns:
+            The full response text
+        """
+        if not stream:
+            return await self.gpt_client.call_gpt(messages)
+
+        parts = []
+        async for token in self.gpt_client.stream_gpt(messages):
+            print(token, end='', flush=True)
+            parts.append(token)
+        print()
+        return "".join(parts)
+
+    async def process_query(self, query: str, stream: bool = False) -> str:
         """
         Process a query using OpenAI and the MCP server's tools
         
         Args:
             query: The user's question or request
+            stream: Whether to print GPT output and tool results as they arrive
             
         Returns:
             OpenAI's response as a string
@@ -173,38 +226,46 @@ If you need to use any of these tools to answer the user's question, please spec
             messages = self.build_context_messages(query)
 
             print("Sending query to GPT...")
-            response_content = self.gpt_client.call_gpt(messages)
+            response_content = await self.get_gpt_text(messages, stream)
 
             # Process response and handle potential tool usage
             final_text = [response_content]
             
             # Simple tool detection - look for tool names in the response
             # This is a simplified approach since we're not using native tool calling
-            tool_used = False
-            for tool in self.tools:
-                if tool.name.lower() in response_content.lower():
-                    try:
-                        # For now, try calling the tool with empty parameters
-                        # In a more sophisticated implementation, you'd parse parameters from the response
-                        print(f"Attempting to call tool: {tool.name}")
-                        result = await self.session.call_tool(tool.name, {})
-                        tool_result = result.content
-                        final_text.append(f"\n[Tool: {tool.name}]\n{tool_result}")
-                        
-                        # Get final response with tool results
-                        messages.append({"role": "assistant", "content": response_content})
-                        messages.append({"role": "user", "content": f"Here's the result from {tool.name}: {tool_result}. Please provide a final answer based on this information."})
-                        
-                        print("Getting final response with tool results...")
-                        final_response = self.gpt_client.call_gpt(messages)
-                        final_text.append(f"\n{final_response}")
-                        tool_used = True
-                        break
-                        
-                    except Exception as e:
-                        error_msg = f"Error calling tool {tool.name}: {str(e)}"
+            matched_tools = []
+            if self._tool_pattern:
+                matched_names = dict.fromkeys(m.group(0) for m in self._tool_pattern.finditer(response_content.lower()))
+                matched_tools = [self._tools_by_name[name] for name in matched_names]
+            if matched_tools:
+                # For now, try calling the tools with empty parameters
+                # In a more sophisticated implementation, you'd parse parameters from the response
+                print(f"Attempting to call tools: {', '.join(tool.name for tool in matched_tools)}")
+                results = await asyncio.gather(
+                    *(self.call_tool_cached(tool.name, {}) for tool in matched_tools),
+                    return_exceptions=True
+                )
+
+                tool_results = []
+                for tool, tool_result in zip(matched_tools, results):
+                    if isinstance(tool_result, Exception):
+                        error_msg = f"Error calling tool {tool.name}: {str(tool_result)}"
                         print(error_msg)
-                        final_text.append(f"\n[Error with tool {tool.name}]: {str(e)}")
+                        final_text.append(f"\n[Error with tool {tool.name}]: {str(tool_result)}")
+                        continue
+                    final_text.append(f"\n[Tool: {tool.name}]\n{tool_result}")
+                    if stream:
+                        print(f"\n[Tool: {tool.name}]\n{tool_result}")
+                    tool_results.append(f"Here's the result from {tool.name}: {tool_result}.")
+
+                if tool_results:
+                    # Get final response with tool results
+                    messages.append({"role": "assistant", "content": response_content})
+                    messages.append({"role": "user", "content": " ".join(tool_results) + " Please provide a final answer based on this information."})
+                    
+                    print("Getting final response with tool results...")
+                    final_response = await self.get_gpt_text(messages, stream)
+                    final_text.append(f"\n{final_response}")
 
             # Combine all response parts
             final_response = "\n".join([text for text in final_text if text])
@@ -225,6 +286,18 @@ If you need to use any of these tools to answer the user's question, please spec
             
             return error_response
 
+    async def process_queries(self, queries: list) -> list:
+        """
+        Process several independent queries concurrently
+        
+        Args:
+            queries: The user's questions or requests
+            
+        Returns:
+            List of responses, in the same order as the queries
+        """
+        return await asyncio.gather(*(self.process_query(query) for query in queries))
+
     async def chat_loop(self):
         """Run an interactive chat loop"""
         print("\nMCP Stdio Client Started! Let's start chatting.")
@@ -236,9 +309,9 @@ If you need to use any of these tools to answer the user's question, please spec
                 if query.lower() in ('quit', 'exit'):
                     break
 
-                response = await self.process_query(query)
+                # The response is printed while it streams in
                 print("\nResponse:")
-                print(response)
+                await self.process_query(query, stream=True)
 
             except Exception as e:
                 print(f"\nError: {str(e)}")
@@ -252,6 +325,85 @@ If you need to use any of these tools to answer the user's question, please spec
             print("Connection to MCP server closed")
 
 
+class AsyncLoopThread(threading.Thread):
+    """
+    A daemon thread running one persistent event loop, so synchronous callers can
+    submit coroutines to it and the MCP stdio transport always lives on the same loop
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.loop = asyncio.new_event_loop()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Run a coroutine on the loop and block until its result is ready"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def stop(self):
+        """Stop the loop and wait for the thread to finish"""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join()
+        self.loop.close()
+
+
+class MCPClientWrapper:
+    """
+    Synchronous wrapper around MCPStdioClient for callers without an event loop.
+    Connecting, tool calls, GPT calls and cleanup all run on one background loop.
+    """
+
+    def __init__(self):
+        self._loop_thread = AsyncLoopThread()
+        self._loop_thread.start()
+        self._client = MCPStdioClient()
+        self._stop_event: Optional[asyncio.Event] = None
+        self._session_future = None
+
+    async def _run_session(self, server_script_path: str, use_uv: bool, server_dir: str, connected: concurrent.futures.Future):
+        """Own the server connection in a single task, since the stdio transport's
+        cancel scopes must be entered and exited by the same task"""
+        self._stop_event = asyncio.Event()
+        try:
+            ok = await self._client.connect_to_server(server_script_path, use_uv, server_dir)
+            connected.set_result(ok)
+            if ok:
+                await self._stop_event.wait()
+        except BaseException as e:
+            if not connected.done():
+                connected.set_exception(e)
+            raise
+        finally:
+            await self._client.cleanup()
+
+    def connect_to_server(self, server_script_path: str, use_uv: bool = False, server_dir: str = None) -> bool:
+        """Connect to an MCP server via stdio (see MCPStdioClient.connect_to_server)"""
+        connected = concurrent.futures.Future()
+        self._session_future = asyncio.run_coroutine_threadsafe(
+            self._run_session(server_script_path, use_uv, server_dir, connected), self._loop_thread.loop)
+        return connected.result()
+
+    def process_query(self, query: str) -> str:
+        """Process a query using GPT and the server's tools"""
+        return self._loop_thread.submit(self._client.process_query(query))
+
+    def call_tool_sync(self, tool_name: str, parameters: dict):
+        """Call a tool on the server and return the result content"""
+        return self._loop_thread.submit(self._client.call_tool_cached(tool_name, parameters))
+
+    def close(self):
+        """Close the server connection and stop the background loop"""
+        try:
+            if self._session_future is not None:
+                self._loop_thread.loop.call_soon_threadsafe(self._stop_event.set)
+                self._session_future.result()
+        finally:
+            self._loop_thread.stop()
+
+
 async def main():
     # Validate command line arguments
     if len(sys.argv) < 2:
@@ -288,4 +440,12 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # Use uvloop's faster event loop where it is available (not on Windows)
+    loop_factory = None
+    if sys.platform != 'win32':
+        try:
+            import uvloop
+            loop_factory = uvloop.new_event_loop
+        except ImportError:
+            pass
+    asyncio.run(main(), loop_factory=loop_factory)
\ No newline at end of file
@@ -6,6 +6,7 @@ import sys
 from typing import Optional
 from contextlib import AsyncExitStack
 
+import orjson
 from openai import OpenAI
 from dotenv import load_dotenv
 
@@ -13,6 +14,30 @@ from dotenv import load_dotenv
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+# JSON schema keywords the model does not need, and keywords whose values are sub-schemas
+_UNUSED_SCHEMA_KEYS = {"title", "examples"}
+_SUBSCHEMA_KEYS = {"items", "additionalProperties", "not", "anyOf", "oneOf", "allOf", "prefixItems"}
+_SCHEMA_MAP_KEYS = {"properties", "$defs", "definitions"}
+
+def compact_schema(schema):
+    """Copy of a tool's input schema without keywords the model does not use"""
+    if isinstance(schema, list):
+        return [compact_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    compact = {}
+    for key, value in schema.items():
+        if key in _UNUSED_SCHEMA_KEYS:
+            continue
+        if key in _SCHEMA_MAP_KEYS and isinstance(value, dict):
+            compact[key] = {name: compact_schema(sub) for name, sub in value.items()}
+        elif key in _SUBSCHEMA_KEYS:
+            compact[key] = compact_schema(value)
+        else:
+            compact[key] = value
+    return compact
+
 class MCPStdioClient:
     """
     An MCP client that connects to an MCP server using stdio communication
@@ -37,8 +62,13 @@ class MCPStdioClient:
         self.write = None
         self.exit_stack = AsyncExitStack()
         
-        # Store server tools
+        # Environment for the server process, with variables loaded from .env
+        self._env = os.environ.copy()
+        self._env["OPENAI_API_KEY"] = self.api_key
+        
+        # Store server tools, plus their OpenAI tool definitions
         self.tools = []
+        self._available_tools = []
 
     async def connect_to_server(self, server_script_path: str, use_uv: bool = False, server_dir: str = None) -> bool:
         """
@@ -63,9 +93,6 @@ class MCPStdioClient:
                 return False
 
             # Configure server parameters based on whether we're using uv or not
-            env = os.environ.copy()  # Use environment with variables loaded from .env
-            env["OPENAI_API_KEY"] = self.api_key
-
             if use_uv and is_python and server_dir:
                 # Using uv to run the server from specified directory
                 print(f"Using uv to run server from directory: {server_dir}")
@@ -80,10 +107,10 @@ class MCPStdioClient:
             server_params = StdioServerParameters(
                 command=command,
                 args=args,
-                env=env  # Use environment with variables loaded from .env
+                env=self._env
             )
 
-            print(f"env: {env}")
+            print(f"env: {self._env}")
 
 
 
@@ -99,6 +126,16 @@ class MCPStdioClient:
             # Fetch available tools
             response = await self.session.list_tools()
             self.tools = response.tools
+
+            # Convert MCP tools to OpenAI tool format once per connection
+            self._available_tools = [{
+                "type": "function",
+                "function": {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "parameters": compact_schema(tool.inputSchema)
+                }
+            } for tool in self.tools]
             
             if self.tools:
                 print(f"\nConnected to server with {len(self.tools)} tools:")
@@ -135,22 +172,12 @@ class MCPStdioClient:
                 {"role": "user", "content": query}
             ]
 
-            # Convert MCP tools to OpenAI tool format
-            available_tools = [{
-                "type": "function",
-                "function": {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "parameters": tool.inputSchema
-                }
-            } for tool in self.tools]
-
             # Initial OpenAI API call with tools
             print("Sending query to OpenAI...")
             response = self.openai.chat.completions.create(
                 model="gpt-4-turbo",  # Using GPT-4 Turbo for tool use
                 messages=messages,
-                tools=available_tools,
+                tools=self._available_tools,
                 tool_choice="auto",  # Let the model decide whether to use tools
                 max_tokens=1000
             )
@@ -175,11 +202,10 @@ class MCPStdioClient:
                     tool_args = tool_call.function.arguments
                     
                     # Convert string arguments to JSON if needed
-                    import json
                     if isinstance(tool_args, str):
                         try:
-                            tool_args = json.loads(tool_args)
-                        except json.JSONDecodeError:
+                            tool_args = orjson.loads(tool_args)
+                        except orjson.JSONDecodeError:
                             print(f"Warning: Could not parse tool args as JSON: {tool_args}")
                             tool_args = {}
                     
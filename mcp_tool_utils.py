@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+
+import orjson
+
+# Tool descriptions are cut to their first line and this many characters in the system prompt
+MAX_TOOL_DESCRIPTION_LENGTH = 80
+
+def describe_tool(tool) -> str:
+    """One-line summary of a tool for the system prompt: name, parameter names and a short description"""
+    params = ", ".join((tool.inputSchema or {}).get("properties", {}))
+    description = (tool.description or "").strip().split("\n", 1)[0]
+    if len(description) > MAX_TOOL_DESCRIPTION_LENGTH:
+        description = description[:MAX_TOOL_DESCRIPTION_LENGTH - 3] + "..."
+    return f"- {tool.name}({params}): {description}"
+
+
+class TTLCache:
+    """Small in-memory LRU cache whose entries expire after a fixed time-to-live"""
+
+    def __init__(self, ttl: float = 60.0, max_size: int = 128):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stamp, value = entry
+        if time.monotonic() - stamp > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entries"""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached entries"""
+        self._entries.clear()
+
+
+class ToolCacheMixin:
+    """
+    Tool listing and cached tool calls shared by the MCP clients.
+    Clients call init_tool_cache from __init__ and provide session and build_system_message.
+    """
+
+    def init_tool_cache(self, max_concurrent_requests: int = 4):
+        """Set up the tool list, the tool result cache and the session request limit"""
+        # Store server tools, plus a lookup by lowercased name
+        self.tools = []
+        self._tools_by_name = {}
+        
+        # Cache recent tool results keyed on (tool name, parameters)
+        self._tool_cache = TTLCache(ttl=60, max_size=128)
+        
+        # Bound the number of requests in flight on the shared session. The SDK writes
+        # each JSON-RPC message whole through a single writer task, so frames cannot
+        # interleave; this only keeps concurrent tool calls from flooding the server.
+        self.max_concurrent_requests = max_concurrent_requests
+        self._session_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+    async def list_tools(self, refresh: bool = False) -> list:
+        """
+        Return the server's tools, fetching them only when not cached yet
+        
+        Args:
+            refresh: Whether to ask the server again even if tools are cached
+            
+        Returns:
+            List of tools exposed by the server
+        """
+        if refresh or not self.tools:
+            async with self._session_semaphore:
+                response = await self.session.list_tools()
+            self.tools = response.tools
+            self._tools_by_name = {tool.name.lower(): tool for tool in self.tools}
+            self.on_tools_updated()
+        return self.tools
+
+    def on_tools_updated(self):
+        """Refresh whatever is derived from the tool list; called after list_tools fetches it"""
+        self._system_message = self.build_system_message()
+
+    async def call_tool_cached(self, tool_name: str, parameters: dict):
+        """
+        Call a tool on the server, reusing a recent result for identical calls
+        
+        Args:
+            tool_name: Name of the tool to call
+            parameters: Arguments for the tool; force_refresh=True bypasses the cache
+                and is only passed on to tools that declare it
+            
+        Returns:
+            The tool result content
+        """
+        # Parsed model output may carry the flag as a string such as "False"
+        flag = parameters.get("force_refresh")
+        force_refresh = flag in (True, 1) or str(flag).lower() == "true"
+        key_params = {k: v for k, v in parameters.items() if k != "force_refresh"}
+        tool = self._tools_by_name.get(tool_name.lower())
+        if tool is None or "force_refresh" not in (tool.inputSchema or {}).get("properties", {}):
+            parameters = key_params
+        elif "force_refresh" in parameters:
+            parameters = {**key_params, "force_refresh": force_refresh}
+        key = hashlib.blake2b(tool_name.encode() + b":" + orjson.dumps(key_params, option=orjson.OPT_SORT_KEYS)).digest()
+        if not force_refresh:
+            cached = self._tool_cache.get(key)
+            if cached is not None:
+                return cached
+
+        async with self._session_semaphore:
+            result = await self.session.call_tool(tool_name, parameters)
+        if not result.isError:
+            self._tool_cache.set(key, result.content)
+        return result.content
@@ -1,5 +1,6 @@
 import asyncio
 import os
+import re
 import sys
 from typing import Optional
 from contextlib import AsyncExitStack
@@ -13,7 +14,53 @@ from mcp.client.stdio import stdio_client
 # Import our custom Ollama utility class
 from ollama_utils import OllamaCall
 
-class MCPOllamaClient:
+# Shared MCP client helpers live in the repo root, one level up
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mcp_tool_utils import ToolCacheMixin, describe_tool
+
+# Tool request format the model is asked to answer with, e.g.
+# TOOL_REQUEST: compound_interest
+# PARAMETERS: principal=5000, annual_rate=0.06, compounds_per_year=12, years=13
+# Either line may appear anywhere in the response
+_TOOL_RE = re.compile(r'^\s*TOOL_REQUEST:(.*)$', re.MULTILINE)
+_PARAMETERS_RE = re.compile(r'^\s*PARAMETERS:(.*)$', re.MULTILINE)
+_PARAM_RE = re.compile(r'(\w+)=([^,]+)')
+
+def parse_tool_request(response_content: str) -> tuple:
+    """
+    Extract a tool request from a model response
+    
+    Args:
+        response_content: The model's response text
+        
+    Returns:
+        (tool_name, parameters) tuple; tool_name is None if no tool was requested
+    """
+    match = _TOOL_RE.search(response_content)
+    if not match:
+        return None, {}
+
+    tool_name = match.group(1).strip()
+    params_match = _PARAMETERS_RE.search(response_content)
+    parameters = {}
+    if params_match:
+        params_str = params_match.group(1)
+        # Example: "principal=5000, annual_rate=0.06, compounds_per_year=12, years=13"
+        for key, value in _PARAM_RE.findall(params_str):
+            # Try to convert to appropriate type
+            value = value.strip()
+            try:
+                # Try int first
+                if '.' not in value:
+                    parameters[key] = int(value)
+                else:
+                    parameters[key] = float(value)
+            except ValueError:
+                # Keep as string if not a number
+                parameters[key] = value
+    return tool_name or None, parameters
+
+class MCPOllamaClient(ToolCacheMixin):
     """
     An MCP client that connects to an MCP server using stdio communication
     and processes queries using Ollama local models and the server's tools.
@@ -26,27 +73,34 @@ class MCPOllamaClient:
         # Initialize Ollama client using our custom class
         self.ollama_client = OllamaCall(model_name=model_name)
         
-        # Test Ollama connection
+        # Initialize session and stdio objects
+        self.session: Optional[ClientSession] = None
+        self.stdio = None
+        self.write = None
+        self.exit_stack = AsyncExitStack()
+        
+        # Environment for the server process, with variables loaded from .env
+        self._env = os.environ.copy()
+        
+        # Server tools and cached tool results
+        self.init_tool_cache()
+        self._system_message = self.build_system_message()
+
+    async def check_ollama_connection(self) -> bool:
+        """Test the connection to Ollama and print setup hints if it fails"""
+        model_name = self.ollama_client.model_name
         print(f"Testing connection to Ollama with model: {model_name}")
-        if not self.ollama_client.test_connection():
+        if not await self.ollama_client.test_connection():
             print("Warning: Could not connect to Ollama. Make sure:")
             print("1. Ollama is installed")
             print("2. Ollama server is running (ollama serve)")
             print(f"3. Model '{model_name}' is available (ollama pull {model_name})")
-            available_models = self.ollama_client.list_models()
+            available_models = await self.ollama_client.list_models()
             if available_models:
                 print(f"Available models: {available_models}")
-        else:
-            print("✓ Successfully connected to Ollama")
-        
-        # Initialize session and stdio objects
-        self.session: Optional[ClientSession] = None
-        self.stdio = None
-        self.write = None
-        self.exit_stack = AsyncExitStack()
-        
-        # Store server tools
-        self.tools = []
+            return False
+        print("✓ Successfully connected to Ollama")
+        return True
 
     async def connect_to_server(self, server_script_path: str, use_uv: bool = False, server_dir: str = None) -> bool:
         """
@@ -64,8 +118,6 @@ class MCPOllamaClient:
             print(f"Connecting to MCP server at: {server_script_path}")
             
             # Configure server parameters based on whether we're using uv or not
-            env = os.environ.copy()  # Use environment with variables loaded from .env
-            
             # When using uv, we don't need file extension validation as it's a package name
             if use_uv and server_dir:
                 # Using uv package - no file extension required
@@ -94,7 +146,7 @@ class MCPOllamaClient:
             server_params = StdioServerParameters(
                 command=command,
                 args=args,
-                env=env
+                env=self._env
             )
 
             # Connect to server
@@ -106,9 +158,9 @@ class MCPOllamaClient:
             print("Initializing MCP session...")
             await self.session.initialize()
 
-            # Fetch available tools
-            response = await self.session.list_tools()
-            self.tools = response.tools
+            # Fetch available tools (results from a previous server are no longer valid)
+            self._tool_cache.clear()
+            await self.list_tools(refresh=True)
             
             if self.tools:
                 print(f"\nConnected to server with {len(self.tools)} tools:")
@@ -125,6 +177,19 @@ class MCPOllamaClient:
             traceback.print_exc()
             return False
 
+    def build_system_message(self) -> str:
+        """Build the system message describing the server's tools and the tool request format"""
+        tools_info = "\n".join([describe_tool(tool) for tool in self.tools])
+        return f"""You are a helpful assistant that helps users with queries. 
+You have access to the following tools:
+{tools_info}
+
+If you need to use any of these tools to answer the user's question, please respond with:
+TOOL_REQUEST: <tool_name>
+PARAMETERS: <describe what parameters you need>
+
+Otherwise, provide a direct answer to the user's question."""
+
     async def process_query(self, query: str) -> str:
         """
         Process a query using Ollama and the MCP server's tools
@@ -139,90 +204,42 @@ class MCPOllamaClient:
             return "Error: Not connected to an MCP server"
             
         try:
-            # Create system message with available tools information
-            tools_info = "\n".join([f"- {tool.name}: {tool.description}" for tool in self.tools])
-            system_message = f"""You are a helpful assistant that helps users with queries. 
-You have access to the following tools:
-{tools_info}
-
-If you need to use any of these tools to answer the user's question, please respond with:
-TOOL_REQUEST: <tool_name>
-PARAMETERS: <describe what parameters you need>
-
-Otherwise, provide a direct answer to the user's question."""
-
             # Initial call to Ollama
             messages = [
-                {"role": "system", "content": system_message},
+                {"role": "system", "content": self._system_message},
                 {"role": "user", "content": query}
             ]
 
             print("Sending query to Ollama...")
-            response_content = self.ollama_client.call_ollama(messages)
+            response_content = await self.ollama_client.call_ollama(messages)
 
             # Process response and handle potential tool usage
             final_text = [response_content]
             
             # Check if Ollama wants to use a tool
-            if "TOOL_REQUEST:" in response_content:
-                lines = response_content.split('\n')
-                tool_name = None
-                parameters = {}
-                
-                for line in lines:
-                    if line.strip().startswith("TOOL_REQUEST:"):
-                        tool_name = line.replace("TOOL_REQUEST:", "").strip()
-                    elif line.strip().startswith("PARAMETERS:"):
-                        params_str = line.replace("PARAMETERS:", "").strip()
-                        # Parse the parameters from the response
-                        # Example: "principal=5000, annual_rate=0.06, compounds_per_year=12, years=13"
-                        try:
-                            import re
-                            # Extract key=value pairs
-                            param_matches = re.findall(r'(\w+)=([^,]+)', params_str)
-                            for key, value in param_matches:
-                                # Try to convert to appropriate type
-                                value = value.strip()
-                                try:
-                                    # Try int first
-                                    if '.' not in value:
-                                        parameters[key] = int(value)
-                                    else:
-                                        parameters[key] = float(value)
-                                except ValueError:
-                                    # Keep as string if not a number
-                                    parameters[key] = value
-                        except Exception as e:
-                            print(f"Warning: Could not parse parameters: {e}")
-                            parameters = {}
+            tool_name, parameters = parse_tool_request(response_content)
+            if tool_name:
+                # Find the tool
+                tool_to_use = self._tools_by_name.get(tool_name.lower())
                 
-                if tool_name:
-                    # Find the tool
-                    tool_to_use = None
-                    for tool in self.tools:
-                        if tool.name.lower() == tool_name.lower():
-                            tool_to_use = tool
-                            break
-                    
-                    if tool_to_use:
-                        try:
-                            print(f"Calling tool: {tool_to_use.name} with parameters: {parameters}")
-                            result = await self.session.call_tool(tool_to_use.name, parameters)
-                            tool_result = result.content
-                            final_text.append(f"\n[Tool: {tool_to_use.name}]\n{tool_result}")
-                            
-                            # Get final response with tool results
-                            messages.append({"role": "assistant", "content": response_content})
-                            messages.append({"role": "user", "content": f"Here's the result from {tool_to_use.name}: {tool_result}. Please provide a final answer based on this information."})
-                            
-                            print("Getting final response with tool results...")
-                            final_response = self.ollama_client.call_ollama(messages)
-                            final_text.append(f"\n{final_response}")
-                            
-                        except Exception as e:
-                            error_msg = f"Error calling tool {tool_to_use.name}: {str(e)}"
-                            print(error_msg)
-                            final_text.append(f"\n[Error with tool {tool_to_use.name}]: {str(e)}")
+                if tool_to_use:
+                    try:
+                        print(f"Calling tool: {tool_to_use.name} with parameters: {parameters}")
+                        tool_result = await self.call_tool_cached(tool_to_use.name, parameters)
+                        final_text.append(f"\n[Tool: {tool_to_use.name}]\n{tool_result}")
+                        
+                        # Get final response with tool results
+                        messages.append({"role": "assistant", "content": response_content})
+                        messages.append({"role": "user", "content": f"Here's the result from {tool_to_use.name}: {tool_result}. Please provide a final answer based on this information."})
+                        
+                        print("Getting final response with tool results...")
+                        final_response = await self.ollama_client.call_ollama(messages)
+                        final_text.append(f"\n{final_response}")
+                        
+                    except Exception as e:
+                        error_msg = f"Error calling tool {tool_to_use.name}: {str(e)}"
+                        print(error_msg)
+                        final_text.append(f"\n[Error with tool {tool_to_use.name}]: {str(e)}")
 
             return "\n".join([text for text in final_text if text])
             
@@ -232,6 +249,18 @@ Otherwise, provide a direct answer to the user's question."""
             traceback.print_exc()
             return f"Error processing query: {str(e)}"
 
+    async def process_queries(self, queries: list) -> list:
+        """
+        Process several independent queries concurrently
+        
+        Args:
+            queries: The user's questions or requests
+            
+        Returns:
+            List of responses, in the same order as the queries
+        """
+        return await asyncio.gather(*(self.process_query(query) for query in queries))
+
     async def chat_loop(self):
         """Run an interactive chat loop"""
         print(f"\nMCP Ollama Client Started with model: {self.ollama_client.model_name}")
@@ -258,6 +287,7 @@ Otherwise, provide a direct answer to the user's question."""
         if self.session:
             await self.exit_stack.aclose()
             print("Connection to MCP server closed")
+        await self.ollama_client.aclose()
 
 
 async def main():
@@ -290,6 +320,9 @@ async def main():
     client = MCPOllamaClient(model_name=model_name)
     
     try:
+        # Test Ollama connection
+        await client.check_ollama_connection()
+        
         # Connect to server
         if await client.connect_to_server(server_script, use_uv, server_dir):
             # Start interactive chat loop
@@ -300,4 +333,12 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    # Use uvloop's faster event loop where it is available (not on Windows)
+    loop_factory = None
+    if sys.platform != 'win32':
+        try:
+            import uvloop
+            loop_factory = uvloop.new_event_loop
+        except ImportError:
+            pass
+    asyncio.run(main(), loop_factory=loop_factory)
\ No newline at end of file
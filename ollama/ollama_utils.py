@@ -1,5 +1,6 @@
-import requests
-import json
+import httpx
+import orjson
+import time
 from typing import List, Dict, Optional
 
 class OllamaCall:
@@ -15,26 +16,36 @@ class OllamaCall:
         self.base_url = base_url
         self.api_url = f"{base_url}/api/chat"
         
-    def is_ollama_running(self) -> bool:
+        # Shared client so the keep-alive connection to Ollama is reused across calls
+        self._client = httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=4))
+        
+        # Time of the last successful health check; it is repeated at most every 30 seconds
+        self._last_health_check_ts = 0.0
+        self.health_check_interval = 30
+        
+    async def is_ollama_running(self) -> bool:
         """Check if Ollama server is running"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
-        except requests.exceptions.RequestException:
+            response = await self._client.get(f"{self.base_url}/api/tags", timeout=5)
+            if response.status_code == 200:
+                self._last_health_check_ts = time.monotonic()
+                return True
+            return False
+        except httpx.HTTPError:
             return False
     
-    def list_models(self) -> List[str]:
+    async def list_models(self) -> List[str]:
         """List available models"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags")
+            response = await self._client.get(f"{self.base_url}/api/tags")
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 return [model['name'] for model in data.get('models', [])]
             return []
-        except requests.exceptions.RequestException:
+        except httpx.HTTPError:
             return []
     
-    def call_ollama(self, messages: List[Dict[str, str]], stream: bool = False) -> str:
+    async def call_ollama(self, messages: List[Dict[str, str]], stream: bool = False) -> str:
         """
         Call Ollama API with chat messages
         
@@ -45,7 +56,8 @@ class OllamaCall:
         Returns:
             Response content as string
         """
-        if not self.is_ollama_running():
+        health_check_due = time.monotonic() - self._last_health_check_ts > self.health_check_interval
+        if health_check_due and not await self.is_ollama_running():
             raise Exception("Ollama server is not running. Please start it with 'ollama serve'")
         
         payload = {
@@ -55,38 +67,48 @@ class OllamaCall:
         }
         
         try:
-            response = requests.post(
+            async with self._client.stream(
+                "POST",
                 self.api_url,
-                json=payload,
+                content=orjson.dumps(payload),
+                headers={"Content-Type": "application/json"},
                 timeout=120  # Increased timeout for local models
-            )
-            
-            if response.status_code == 200:
-                if stream:
-                    # Handle streaming response
-                    full_response = ""
-                    for line in response.iter_lines():
-                        if line:
-                            data = json.loads(line.decode('utf-8'))
-                            if 'message' in data and 'content' in data['message']:
-                                full_response += data['message']['content']
-                    return full_response
+            ) as response:
+                
+                if response.status_code == 200:
+                    if stream:
+                        # Handle streaming response
+                        parts = []
+                        async for line in response.aiter_lines():
+                            if line:
+                                data = orjson.loads(line)
+                                if 'message' in data and 'content' in data['message']:
+                                    parts.append(data['message']['content'])
+                        return "".join(parts)
+                    else:
+                        # Handle non-streaming response
+                        await response.aread()
+                        data = orjson.loads(response.content)
+                        return data['message']['content']
                 else:
-                    # Handle non-streaming response
-                    data = response.json()
-                    return data['message']['content']
-            else:
-                raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
+                    await response.aread()
+                    raise Exception(f"Ollama API error: {response.status_code} - {response.text}")
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
+            # Force a fresh health check on the next call
+            self._last_health_check_ts = 0.0
             raise Exception(f"Failed to connect to Ollama: {str(e)}")
     
-    def test_connection(self) -> bool:
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self._client.aclose()
+    
+    async def test_connection(self) -> bool:
         """Test connection to Ollama with a simple message"""
         try:
             test_messages = [{"role": "user", "content": "Hello, respond with just 'OK' if you can see this."}]
-            response = self.call_ollama(test_messages)
+            response = await self.call_ollama(test_messages)
             return "OK" in response or "ok" in response.lower()
         except Exception as e:
             print(f"Connection test failed: {e}")
-            return False
\ No newline at end of file
+            return False
@@ -1,6 +1,8 @@
+import io
+import time
 from typing import Optional
 import httpx
-import feedparser
+from lxml import etree
 from fastmcp import FastMCP
 
 # Initialize FastMCP
@@ -8,45 +10,102 @@ mcp = FastMCP("ynet_feed")
 
 FEED_URL = "https://www.ynet.co.il/Integration/StoryRss2.xml"  # Ynet main news RSS
 
-async def fetch_rss(url: str) -> str | None:
-    """Fetch raw RSS feed content asynchronously."""
+_DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "Accept": "application/rss+xml,application/xml;q=0.9,*/*;q=0.8",
+    # Compressed XML is a fraction of the size; httpx decodes all three (brotli/zstd via the httpx extras)
+    "Accept-Encoding": "gzip, br, zstd",
+}
+
+# Shared client so the connection to the feed host stays warm across tool calls;
+# it is closed when the server process exits
+_http = httpx.AsyncClient(
+    follow_redirects=True,
+    http2=True,
+    timeout=10,
+    headers=_DEFAULT_HEADERS,
+    limits=httpx.Limits(max_keepalive_connections=2, keepalive_expiry=300),
+)
+
+# Last fetched feed body per URL, with the validators needed for conditional requests
+_feed_cache: dict[str, dict] = {}
+FEED_CACHE_TTL = 30  # Seconds during which a cached feed is reused without any HTTP request
+
+async def fetch_rss(url: str, force_refresh: bool = False) -> bytes | None:
+    """Fetch raw RSS feed content asynchronously, reusing the cached copy while it is fresh or unchanged."""
+    cached = _feed_cache.get(url)
+    if cached and not force_refresh and time.monotonic() - cached["ts"] < FEED_CACHE_TTL:
+        return cached["content"]
+
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-            "Accept": "application/rss+xml,application/xml;q=0.9,*/*;q=0.8",
-        }
-
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                return response.text
-            else:
-                print(f"❌ HTTP error: {response.status_code}")
+        headers = {}
+        if cached and not force_refresh:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = await _http.get(url, headers=headers)
+        if response.status_code == 304 and cached:
+            cached["ts"] = time.monotonic()
+            return cached["content"]
+        elif response.status_code == 200:
+            _feed_cache[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "content": response.content,
+                "ts": time.monotonic(),
+            }
+            return response.content
+        else:
+            print(f"❌ HTTP error: {response.status_code}")
     except Exception as e:
         print(f"❌ Exception occurred: {e}")
     return None
 
+def parse_rss_items(content: bytes, limit: int) -> list[dict]:
+    """Parse the first `limit` items of raw RSS content, without reading the rest of the document."""
+    items = []
+    if limit <= 0:
+        return items
+
+    for _, item in etree.iterparse(io.BytesIO(content), tag="item", recover=True):
+        items.append({
+            "title": (item.findtext("title") or "").strip(),
+            "published": (item.findtext("pubDate") or "No date").strip(),
+            "link": (item.findtext("link") or "").strip(),
+        })
+        item.clear()
+        if len(items) >= limit:
+            break
+    return items
+
 @mcp.tool()
-async def get_headlines_from_ynet(limit: int = 5) -> str:
+async def get_headlines_from_ynet(limit: int = 5, force_refresh: bool = False) -> str:
     """Fetch latest headlines from ynet.co.il
 
     Args:
         limit: Number of feed items to return (default 5)
+        force_refresh: Bypass cached headlines and fetch the feed again (default False)
     """
-    raw_feed = await fetch_rss(FEED_URL)
+    raw_feed = await fetch_rss(FEED_URL, force_refresh=force_refresh)
     if not raw_feed:
         return "⚠️ Failed to fetch the RSS feed."
 
-    feed = feedparser.parse(raw_feed)
-    if not feed.entries:
+    try:
+        items = parse_rss_items(raw_feed, limit)
+    except etree.XMLSyntaxError as e:
+        print(f"❌ Could not parse the RSS feed: {e}")
+        return "⚠️ Failed to parse the RSS feed."
+    if not items:
         return "ℹ️ No entries found in the feed."
 
     entries = []
-    for entry in feed.entries[:limit]:
+    for item in items:
         formatted = f"""
-📰 {entry.title}
-📅 {entry.get('published', 'No date')}
-🔗 {entry.link}
+📰 {item['title']}
+📅 {item['published']}
+🔗 {item['link']}
 """.strip()
         entries.append(formatted)
 
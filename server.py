@@ -1,15 +1,51 @@
 # server.py
+from functools import lru_cache
+from math import exp, log1p
+from typing import TypedDict
+
+import numpy as np
 from fastmcp import FastMCP
 
 mcp = FastMCP("Demo for AI Summer Days MCP workshop")
 
+class CompoundInterestResult(TypedDict):
+    principal: float
+    annual_rate_percent: float
+    compounds_per_year: int
+    years: float
+    final_amount: float
+    interest_earned: float
+    total_return_percent: float
+
+class CompoundInterestBatchResult(TypedDict):
+    final_amount: list[float]
+    interest_earned: list[float]
+    total_return_percent: list[float]
+
+def _compound_final_amount(principal: float, annual_rate: float, compounds_per_year: int, years: float) -> float:
+    """A = P(1 + r/n)^(nt), computed as P * exp(nt * log1p(r/n)) to keep precision for small r/n"""
+    rate_per_period = annual_rate / compounds_per_year
+    if rate_per_period < -1:
+        raise ValueError("annual_rate cannot be below -compounds_per_year (more than a total loss per period)")
+    if rate_per_period == -1:
+        # Total loss; log1p is undefined at -1, so use the formula directly
+        return principal * (1 + rate_per_period) ** (compounds_per_year * years)
+    return principal * exp(compounds_per_year * years * log1p(rate_per_period))
+
+@lru_cache(maxsize=1024)
+def _compound_interest_cached(principal: float, annual_rate: float, compounds_per_year: int, years: float) -> tuple[float, float, float]:
+    """Rounded (final amount, interest earned, total return %) for one scenario; repeated calls hit the cache"""
+    final_amount = _compound_final_amount(principal, annual_rate, compounds_per_year, years)
+    interest_earned = final_amount - principal
+    return round(final_amount, 2), round(interest_earned, 2), round((interest_earned / principal) * 100, 2)
+
 @mcp.tool
-def add(a: int, b: int) -> int:
+async def add(a: int, b: int) -> int:
     """Add two numbers"""
-    return int(a) + int(b)
+    return a + b
 
 @mcp.tool
-def compound_interest(principal: float, annual_rate: float, compounds_per_year: int, years: float) -> dict:
+async def compound_interest(principal: float, annual_rate: float, compounds_per_year: int, years: float) -> CompoundInterestResult:
     """
     Calculate compound interest investment returns.
     
@@ -27,19 +63,60 @@ def compound_interest(principal: float, annual_rate: float, compounds_per_year:
     Example:
         compound_interest(5000, 0.06, 12, 13) calculates $5,000 at 6% compounded monthly for 13 years
     """
-    # A = P(1 + r/n)^(nt)
-    final_amount = principal * (1 + annual_rate / compounds_per_year) ** (compounds_per_year * years)
-    interest_earned = final_amount - principal
+    # Normalize float inputs so trivial JSON float noise still hits the cache
+    final_amount, interest_earned, total_return_percent = _compound_interest_cached(
+        round(principal, 10), round(annual_rate, 10), compounds_per_year, round(years, 10))
+    
+    return CompoundInterestResult(
+        principal=principal,
+        annual_rate_percent=annual_rate * 100,
+        compounds_per_year=compounds_per_year,
+        years=years,
+        final_amount=final_amount,
+        interest_earned=interest_earned,
+        total_return_percent=total_return_percent
+    )
+
+@mcp.tool
+async def compound_interest_batch(principal: list[float], annual_rate: list[float], compounds_per_year: list[int], years: list[float]) -> CompoundInterestBatchResult:
+    """
+    Calculate compound interest for many scenarios in a single call.
+    
+    Each argument is a list with one entry per scenario; all lists must have the same length.
+    See compound_interest for the meaning of each argument.
+    
+    Returns:
+        Dictionary with per-scenario lists of final amounts, interest earned and total return percentages
+    
+    Example:
+        compound_interest_batch([5000, 5000], [0.06, 0.04], [12, 12], [13, 13]) compares 6% and 4% rates
+    """
+    P = np.asarray(principal, dtype=np.float64)
+    r = np.asarray(annual_rate, dtype=np.float64)
+    n = np.asarray(compounds_per_year, dtype=np.float64)
+    t = np.asarray(years, dtype=np.float64)
+    if not (P.shape == r.shape == n.shape == t.shape):
+        raise ValueError("principal, annual_rate, compounds_per_year and years must have the same length")
+    bad_rows = np.flatnonzero((n <= 0) | (P == 0))
+    if bad_rows.size:
+        raise ValueError(f"compounds_per_year must be positive and principal non-zero (invalid rows: {bad_rows.tolist()})")
+    
+    # A = P(1 + r/n)^(nt) = P * exp(nt * log1p(r/n)), for all scenarios at once
+    with np.errstate(all="ignore"):
+        rate_per_period = r / n
+        # Total-loss rows (r/n = -1) use the formula directly, as in _compound_final_amount
+        growth = np.where(rate_per_period == -1, (1 + rate_per_period) ** (n * t), np.exp(n * t * np.log1p(rate_per_period)))
+        final_amount = P * growth
+    bad_rows = np.flatnonzero(~np.isfinite(final_amount))
+    if bad_rows.size:
+        raise ValueError(f"Compound interest is not a finite number for rows: {bad_rows.tolist()}")
+    interest_earned = final_amount - P
     
-    return {
-        "principal": principal,
-        "annual_rate_percent": annual_rate * 100,
-        "compounds_per_year": compounds_per_year,
-        "years": years,
-        "final_amount": round(final_amount, 2),
-        "interest_earned": round(interest_earned, 2),
-        "total_return_percent": round((interest_earned / principal) * 100, 2)
-    }
+    return CompoundInterestBatchResult(
+        final_amount=np.round(final_amount, 2).tolist(),
+        interest_earned=np.round(interest_earned, 2).tolist(),
+        total_return_percent=np.round(interest_earned / P * 100, 2).tolist()
+    )
 
 if __name__ == "__main__":
     mcp.run()
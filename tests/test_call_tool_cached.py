@@ -0,0 +1,78 @@
+import asyncio
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "ollama"))
+
+from mcp_client_azure import MCPStdioClient
+from mcp_client_ollama import MCPOllamaClient
+
+
+class FakeSession:
+    """Records call_tool arguments and answers with a successful result"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        return SimpleNamespace(isError=False, content=[f"result {len(self.calls)}"])
+
+
+def make_tool(name, properties):
+    return SimpleNamespace(name=name, description="", inputSchema={"properties": properties})
+
+
+class CallToolCachedTests(unittest.TestCase):
+    client_classes = (MCPStdioClient, MCPOllamaClient)
+
+    def make_client(self, client_class):
+        client = client_class()
+        client.session = FakeSession()
+        tools = [
+            make_tool("add", {"a": {}, "b": {}}),
+            make_tool("get_headlines_from_ynet", {"limit": {}, "force_refresh": {}}),
+        ]
+        client._tools_by_name = {tool.name.lower(): tool for tool in tools}
+        return client
+
+    def test_force_refresh_not_sent_to_tools_without_it(self):
+        for client_class in self.client_classes:
+            with self.subTest(client_class.__name__):
+                client = self.make_client(client_class)
+                first = asyncio.run(client.call_tool_cached("add", {"a": 2, "b": 3}))
+                second = asyncio.run(client.call_tool_cached("add", {"a": 2, "b": 3, "force_refresh": True}))
+                self.assertNotEqual(first, second)
+                self.assertEqual(client.session.calls, [("add", {"a": 2, "b": 3})] * 2)
+
+    def test_force_refresh_sent_to_tools_that_declare_it(self):
+        for client_class in self.client_classes:
+            with self.subTest(client_class.__name__):
+                client = self.make_client(client_class)
+                parameters = {"limit": 3, "force_refresh": True}
+                asyncio.run(client.call_tool_cached("get_headlines_from_ynet", parameters))
+                self.assertEqual(client.session.calls, [("get_headlines_from_ynet", parameters)])
+
+    def test_string_false_does_not_bypass_cache(self):
+        for client_class in self.client_classes:
+            with self.subTest(client_class.__name__):
+                client = self.make_client(client_class)
+                for _ in range(3):
+                    asyncio.run(client.call_tool_cached("get_headlines_from_ynet", {"limit": 3, "force_refresh": "False"}))
+                self.assertEqual(client.session.calls, [("get_headlines_from_ynet", {"limit": 3, "force_refresh": False})])
+
+    def test_string_true_bypasses_cache(self):
+        for client_class in self.client_classes:
+            with self.subTest(client_class.__name__):
+                client = self.make_client(client_class)
+                for _ in range(2):
+                    asyncio.run(client.call_tool_cached("get_headlines_from_ynet", {"limit": 3, "force_refresh": "true"}))
+                self.assertEqual(client.session.calls, [("get_headlines_from_ynet", {"limit": 3, "force_refresh": True})] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
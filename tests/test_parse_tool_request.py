@@ -0,0 +1,28 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ollama"))
+
+from mcp_client_ollama import parse_tool_request
+
+
+class ParseToolRequestTests(unittest.TestCase):
+    def test_parameters_on_next_line(self):
+        self.assertEqual(parse_tool_request("TOOL_REQUEST: add\nPARAMETERS: a=1, b=2"), ("add", {"a": 1, "b": 2}))
+
+    def test_blank_line_between(self):
+        self.assertEqual(parse_tool_request("TOOL_REQUEST: add\n\nPARAMETERS: a=1, b=2"), ("add", {"a": 1, "b": 2}))
+
+    def test_crlf_line_endings(self):
+        self.assertEqual(parse_tool_request("TOOL_REQUEST: add\r\nPARAMETERS: a=1, b=2\r\n"), ("add", {"a": 1, "b": 2}))
+
+    def test_parameters_before_tool_request(self):
+        self.assertEqual(parse_tool_request("PARAMETERS: a=1, b=2.5\nTOOL_REQUEST: add"), ("add", {"a": 1, "b": 2.5}))
+
+    def test_no_tool_request(self):
+        self.assertEqual(parse_tool_request("The answer is 5."), (None, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
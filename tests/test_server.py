@@ -0,0 +1,47 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+
+
+def run_tool(tool, *args):
+    return asyncio.run(tool.fn(*args))
+
+
+class CompoundInterestTests(unittest.TestCase):
+    def test_total_loss(self):
+        self.assertEqual(run_tool(server.compound_interest, 100, -1, 1, 1)["final_amount"], 0.0)
+        self.assertEqual(run_tool(server.compound_interest, 100, -1, 1, 0)["final_amount"], 100.0)
+
+    def test_rejects_rate_below_total_loss(self):
+        with self.assertRaises(ValueError):
+            run_tool(server.compound_interest, 100, -2, 1, 1)
+
+
+class CompoundInterestBatchTests(unittest.TestCase):
+    def test_matches_scalar_tool(self):
+        batch = run_tool(server.compound_interest_batch, [5000, 1000], [0.06, 0.04], [12, 4], [13, 2.5])
+        for i, args in enumerate([(5000, 0.06, 12, 13), (1000, 0.04, 4, 2.5)]):
+            scalar = run_tool(server.compound_interest, *args)
+            self.assertEqual(batch["final_amount"][i], scalar["final_amount"])
+            self.assertEqual(batch["total_return_percent"][i], scalar["total_return_percent"])
+
+    def test_total_loss(self):
+        batch = run_tool(server.compound_interest_batch, [100, 100], [-1, -4], [1, 4], [1, 0])
+        self.assertEqual(batch["final_amount"], [0.0, 100.0])
+
+    def test_rejects_invalid_rows(self):
+        with self.assertRaisesRegex(ValueError, r"\[1, 2\]"):
+            run_tool(server.compound_interest_batch, [5000, 5000, 0], [0.06, 0.06, 0.06], [12, 0, 12], [13, 13, 13])
+
+    def test_rejects_non_finite_results(self):
+        with self.assertRaisesRegex(ValueError, r"\[1\]"):
+            run_tool(server.compound_interest_batch, [100, 100], [0.05, -3], [1, 1], [1, 1.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import asyncio
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+import openai
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gpt_utils import GptCall
+
+
+def make_chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeStream:
+    def __init__(self, chunks, error_at=None):
+        self._chunks = iter(chunks)
+        self._error_at = error_at
+        self._index = 0
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._index == self._error_at:
+            raise openai.APIConnectionError(request=httpx.Request("POST", "https://example.invalid"))
+        self._index += 1
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeClient:
+    """Returns the given streams from chat.completions.create, one per call"""
+
+    def __init__(self, *streams):
+        self._streams = list(streams)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.calls += 1
+        return self._streams.pop(0)
+
+
+async def collect(gpt, messages):
+    return [text async for text in gpt.stream_gpt(messages)]
+
+
+class StreamGptTests(unittest.TestCase):
+    def run_stream(self, client):
+        gpt = GptCall()
+        gpt._client = client
+        with mock.patch.object(GptCall, "get_retry_delay", return_value=0):
+            return asyncio.run(collect(gpt, []))
+
+    def test_retries_until_first_chunk(self):
+        failed, ok = FakeStream([], error_at=0), FakeStream([make_chunk("Hel"), make_chunk("lo")])
+        client = FakeClient(failed, ok)
+        self.assertEqual(self.run_stream(client), ["Hel", "lo"])
+        self.assertEqual(client.calls, 2)
+        self.assertTrue(failed.closed)
+        self.assertTrue(ok.closed)
+
+    def test_closes_stream_when_caller_stops_early(self):
+        stream = FakeStream([make_chunk("Hel"), make_chunk("lo")])
+        gpt = GptCall()
+        gpt._client = FakeClient(stream)
+
+        async def first_piece():
+            pieces = gpt.stream_gpt([])
+            piece = await anext(pieces)
+            await pieces.aclose()
+            return piece
+
+        self.assertEqual(asyncio.run(first_piece()), "Hel")
+        self.assertTrue(stream.closed)
+
+    def test_no_retry_after_first_chunk(self):
+        client = FakeClient(FakeStream([make_chunk("Hel"), make_chunk("lo")], error_at=1), FakeStream([make_chunk("x")]))
+        with self.assertRaises(openai.APIConnectionError):
+            self.run_stream(client)
+        self.assertEqual(client.calls, 1)
+
+
+class FlakyCompletions:
+    """Fails the first `failures` create calls with a connection error, then answers"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.seeds = []
+
+    async def create(self, **kwargs):
+        self.seeds.append(kwargs["seed"])
+        if len(self.seeds) <= self.failures:
+            raise openai.APIConnectionError(request=httpx.Request("POST", "https://example.invalid"))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="OK"))])
+
+
+class GetGptResponseTests(unittest.TestCase):
+    def get_response(self, completions, max_attempts):
+        client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        with mock.patch.object(GptCall, "get_retry_delay", return_value=0):
+            return asyncio.run(GptCall.get_gpt_response(client, [], max_attempts=max_attempts))
+
+    def test_retries_with_new_seed(self):
+        completions = FlakyCompletions(failures=2)
+        self.assertEqual(self.get_response(completions, max_attempts=5), "OK")
+        self.assertEqual(completions.seeds, [42, 43, 44])
+
+    def test_gives_up_after_max_attempts(self):
+        completions = FlakyCompletions(failures=5)
+        self.assertEqual(self.get_response(completions, max_attempts=3), [])
+        self.assertEqual(len(completions.seeds), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()